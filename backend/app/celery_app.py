@@ -0,0 +1,27 @@
+from celery import Celery
+from app.core.config import settings
+
+celery_app = Celery(
+    "property_intelligence",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.tasks.valuation"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    timezone="UTC",
+    enable_utc=True,
+)
+
+# Periodic jobs run by the celery_beat service
+celery_app.conf.beat_schedule = {
+    "refresh-expiring-valuations": {
+        "task": "app.tasks.valuation.refresh_expiring_valuations",
+        "schedule": settings.VALUATION_REFRESH_INTERVAL_MINUTES * 60,
+    },
+}
+
+app = celery_app
@@ -77,6 +77,21 @@ class Settings(BaseSettings):
         "structural",
         "environmental"
     ]
+
+    # Valuation refresh settings
+    VALUATION_VALIDITY_DAYS: int = 90  # how long a refreshed valuation stays fresh
+    VALUATION_REFRESH_LOOKAHEAD_DAYS: int = 7  # refresh valuations expiring within this window
+    VALUATION_REFRESH_INTERVAL_MINUTES: int = 30  # celery beat schedule
+    VALUATION_REFRESH_RATE_LIMIT: str = "2/m"  # celery task rate limit
+    VALUATION_REFRESH_MAX_PER_RUN: int = 5000  # cap on valuations refreshed per run
+    VALUATION_REFRESH_LOCK_TIMEOUT: int = 3600  # seconds; stops overlapping refresh runs
+    VALUATION_INDEX_MIN_SAMPLE: int = 10  # valuations needed for a month to enter the market index
+
+    # Geocoding settings
+    GEOCODING_PROVIDER: str = "google"  # google, stub
+    GEOCODE_LRU_SIZE: int = 10000  # in-memory entries in front of the geocode_cache table
+    GEOCODE_MAX_CONCURRENT_REQUESTS: int = 10
+    GEOCODE_NOT_FOUND_TTL_DAYS: int = 30  # retry unresolvable addresses after this long
     
     class Config:
         env_file = ".env"
@@ -9,4 +9,5 @@ from app.models.property import Property
 from app.models.analysis import PropertyAnalysis
 from app.models.hazard import HazardAssessment
 from app.models.valuation import PropertyValuation
-from app.models.user import User
\ No newline at end of file
+from app.models.user import User
+from app.models.geocode import GeocodeCache
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.db.base import Base
+
+class GeocodeCache(Base):
+    __tablename__ = "geocode_cache"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    
+    # Lookup key
+    normalized_address = Column(String(500), unique=True, index=True, nullable=False)
+    
+    # Geocoding result
+    status = Column(String(20), nullable=False, default="ok")  # ok, not_found
+    latitude = Column(Float)  # null when not_found
+    longitude = Column(Float)
+    formatted_address = Column(String(500))
+    provider = Column(String(50))  # google, stub
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<GeocodeCache {self.normalized_address} ({self.latitude}, {self.longitude})>"
@@ -0,0 +1,208 @@
+from typing import Optional, Tuple
+import re
+
+# USPS Publication 28 abbreviations for the most common street suffixes
+STREET_SUFFIXES = {
+    "ALLEY": "ALY",
+    "AVENUE": "AVE",
+    "AV": "AVE",
+    "BOULEVARD": "BLVD",
+    "BOUL": "BLVD",
+    "CIRCLE": "CIR",
+    "COURT": "CT",
+    "DRIVE": "DR",
+    "EXPRESSWAY": "EXPY",
+    "FREEWAY": "FWY",
+    "HIGHWAY": "HWY",
+    "LANE": "LN",
+    "PARKWAY": "PKWY",
+    "PLACE": "PL",
+    "PLAZA": "PLZ",
+    "ROAD": "RD",
+    "SQUARE": "SQ",
+    "STREET": "ST",
+    "STR": "ST",
+    "TERRACE": "TER",
+    "TRAIL": "TRL",
+    "WAY": "WAY",
+}
+
+DIRECTIONALS = {
+    "NORTH": "N",
+    "SOUTH": "S",
+    "EAST": "E",
+    "WEST": "W",
+    "NORTHEAST": "NE",
+    "NORTHWEST": "NW",
+    "SOUTHEAST": "SE",
+    "SOUTHWEST": "SW",
+}
+
+# Apartment/suite/unit spellings geocode to the same point, so they share one key
+UNIT_DESIGNATORS = {
+    "APARTMENT": "UNIT",
+    "APT": "UNIT",
+    "SUITE": "UNIT",
+    "STE": "UNIT",
+    "ROOM": "UNIT",
+    "RM": "UNIT",
+    "UNIT": "UNIT",
+    "#": "UNIT",
+    "BUILDING": "BLDG",
+    "BLDG": "BLDG",
+    "FLOOR": "FL",
+    "FL": "FL",
+}
+
+STATE_NAMES = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR",
+    "CALIFORNIA": "CA", "COLORADO": "CO", "CONNECTICUT": "CT", "DELAWARE": "DE",
+    "DISTRICT OF COLUMBIA": "DC", "FLORIDA": "FL", "GEORGIA": "GA", "HAWAII": "HI",
+    "IDAHO": "ID", "ILLINOIS": "IL", "INDIANA": "IN", "IOWA": "IA",
+    "KANSAS": "KS", "KENTUCKY": "KY", "LOUISIANA": "LA", "MAINE": "ME",
+    "MARYLAND": "MD", "MASSACHUSETTS": "MA", "MICHIGAN": "MI", "MINNESOTA": "MN",
+    "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT", "NEBRASKA": "NE",
+    "NEVADA": "NV", "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ", "NEW MEXICO": "NM",
+    "NEW YORK": "NY", "NORTH CAROLINA": "NC", "NORTH DAKOTA": "ND", "OHIO": "OH",
+    "OKLAHOMA": "OK", "OREGON": "OR", "PENNSYLVANIA": "PA", "RHODE ISLAND": "RI",
+    "SOUTH CAROLINA": "SC", "SOUTH DAKOTA": "SD", "TENNESSEE": "TN", "TEXAS": "TX",
+    "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA", "WASHINGTON": "WA",
+    "WEST VIRGINIA": "WV", "WISCONSIN": "WI", "WYOMING": "WY",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s#]")
+_WHITESPACE = re.compile(r"\s+")
+_HASH = re.compile(r"#\s*")
+# Long and already-abbreviated spellings, both mapped to the abbreviation
+_SUFFIX_FORMS = {**{short: short for short in STREET_SUFFIXES.values()}, **STREET_SUFFIXES}
+_DIRECTIONAL_FORMS = {**{short: short for short in DIRECTIONALS.values()}, **DIRECTIONALS}
+
+_TRAILING_ZIP = re.compile(r"\b\d{5}(?:[-\s]?\d{4})?\s*$")
+
+# Longest names first so "WEST VIRGINIA" wins over "VIRGINIA"
+_STATE_SPELLINGS = sorted(
+    list(STATE_NAMES) + list(STATE_NAMES.values()), key=len, reverse=True
+)
+
+
+def _clean(value: str) -> str:
+    value = _PUNCTUATION.sub(" ", value.upper())
+    value = _HASH.sub("# ", value)
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def normalize_street(street: str) -> str:
+    """Normalize the street line of an address, e.g. "123 North Market Street, Apt. 4" -> "123 N MARKET ST UNIT 4".
+
+    Only the trailing suffix and the pre/post directionals are abbreviated,
+    so street names like "Court St" or "North St" keep their name word.
+    """
+    tokens = _clean(street).split(" ")
+    unit_at = next((i for i, token in enumerate(tokens) if token in UNIT_DESIGNATORS), len(tokens))
+    name, unit = tokens[:unit_at], tokens[unit_at:]
+
+    # House number, then [pre-directional] name... [suffix] [post-directional]
+    start = 1 if name and any(char.isdigit() for char in name[0]) else 0
+    end = len(name)
+    if end - start >= 3 and name[end - 1] in _DIRECTIONAL_FORMS and name[end - 2] in _SUFFIX_FORMS:
+        name[end - 1] = _DIRECTIONAL_FORMS[name[end - 1]]
+        end -= 1
+    if end - start >= 2 and name[end - 1] in _SUFFIX_FORMS:
+        name[end - 1] = _SUFFIX_FORMS[name[end - 1]]
+        end -= 1
+    if end - start >= 2 and name[start] in _DIRECTIONAL_FORMS:
+        name[start] = _DIRECTIONAL_FORMS[name[start]]
+
+    normalized = list(name)
+    previous_designator = False
+    for token in unit:
+        is_designator = token in UNIT_DESIGNATORS
+        if not (is_designator and previous_designator):
+            # "APT # 4" names the unit once
+            normalized.append(UNIT_DESIGNATORS[token] if is_designator else token)
+        previous_designator = is_designator
+    return " ".join(normalized)
+
+
+def normalize_state(state: str) -> str:
+    state = _clean(state)
+    return STATE_NAMES.get(state, state)
+
+
+def normalize_zip(zip_code: str) -> str:
+    """Keep the five digit ZIP so ZIP+4 and plain ZIP spellings match"""
+    digits = re.sub(r"\D", "", zip_code)
+    return digits[:5] if len(digits) >= 5 else _clean(zip_code)
+
+
+def _is_unit(part: str) -> bool:
+    tokens = _clean(part).split(" ")
+    return bool(tokens) and tokens[0] in UNIT_DESIGNATORS
+
+
+def split_address(address: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    """Split a one-line address into (street, city, state, zip_code).
+
+    Handles "street, city, state zip", "street, city state zip" and
+    "street, city" forms. A trailing part that starts with a unit designator
+    ("123 Main St, Apt 4") stays with the street.
+    """
+    parts = [part.strip() for part in address.split(",") if part.strip()]
+    if len(parts) < 2:
+        return address, None, None, None
+
+    zip_code = None
+    match = _TRAILING_ZIP.search(parts[-1])
+    if match:
+        zip_code = match.group(0).strip()
+        parts[-1] = parts[-1][:match.start()].strip()
+        if not parts[-1]:
+            parts.pop()
+
+    state = None
+    city = None
+    if len(parts) >= 2:
+        tail = _clean(parts[-1])
+        for spelling in _STATE_SPELLINGS:
+            if tail == spelling or tail.endswith(" " + spelling):
+                remainder = tail[:-len(spelling)].strip()
+                # "123 Main St, Washington" names a city, not the state
+                if not (zip_code or remainder or len(parts) >= 3):
+                    break
+                state = spelling
+                parts.pop()
+                if remainder:
+                    city = remainder
+                break
+
+    if city is None and len(parts) >= 2 and not _is_unit(parts[-1]):
+        city = parts.pop()
+
+    return ", ".join(parts), city, state, zip_code
+
+
+def normalize_address(
+    address: str,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    zip_code: Optional[str] = None,
+) -> str:
+    """Build the canonical key used to deduplicate addresses and cache geocoding results.
+
+    A one-line address is split into its components first, so
+    normalize_address("123 Main St, Springfield, IL 62701") and
+    normalize_address("123 Main St", "Springfield", "IL", "62701") agree,
+    as do normalize_address("123 Main St, Springfield") and
+    normalize_address("123 Main St", "Springfield").
+    """
+    if city is None and state is None and zip_code is None:
+        address, city, state, zip_code = split_address(address)
+
+    parts = [normalize_street(address)]
+    if city:
+        parts.append(_clean(city))
+    if state:
+        parts.append(normalize_state(state))
+    if zip_code:
+        parts.append(normalize_zip(zip_code))
+    return ", ".join(part for part in parts if part)
@@ -0,0 +1,319 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import hashlib
+import logging
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.geocode import GeocodeCache
+from app.services.address import normalize_address
+
+logger = logging.getLogger(__name__)
+
+# Cache row statuses
+FOUND = "ok"
+NOT_FOUND = "not_found"
+
+# Keys per cache statement; keeps bind parameters well under asyncpg's 32767 limit
+CACHE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    latitude: float
+    longitude: float
+    formatted_address: Optional[str] = None
+    provider: Optional[str] = None
+
+
+class LRUCache:
+    """Bounded in-memory cache of normalized address -> GeocodeResult"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, GeocodeResult]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[GeocodeResult]:
+        result = self._data.get(key)
+        if result is not None:
+            self._data.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: GeocodeResult) -> None:
+        self._data[key] = result
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class GeocodingProvider:
+    """Resolves addresses to coordinates"""
+
+    name = "base"
+
+    async def geocode(self, addresses: List[str]) -> Dict[str, Optional[GeocodeResult]]:
+        """Return results keyed by address.
+
+        None marks an address the provider definitively could not match;
+        addresses that failed for transient reasons are left out so they are
+        retried later.
+        """
+        raise NotImplementedError
+
+
+class GoogleGeocodingProvider(GeocodingProvider):
+    name = "google"
+    url = "https://maps.googleapis.com/maps/api/geocode/json"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrent: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key or settings.GOOGLE_MAPS_API_KEY
+        self.max_concurrent = max_concurrent or settings.GEOCODE_MAX_CONCURRENT_REQUESTS
+        self.transport = transport
+        if not self.api_key:
+            raise ValueError("GOOGLE_MAPS_API_KEY is required for Google geocoding")
+
+    async def geocode(self, addresses: List[str]) -> Dict[str, Optional[GeocodeResult]]:
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        results: Dict[str, Optional[GeocodeResult]] = {}
+
+        async def lookup(client: httpx.AsyncClient, address: str) -> None:
+            async with semaphore:
+                try:
+                    response = await client.get(self.url, params={"address": address, "key": self.api_key})
+                    response.raise_for_status()
+                    data = response.json()
+                    if data.get("status") == "ZERO_RESULTS":
+                        results[address] = None
+                        return
+                    if data.get("status") != "OK" or not data.get("results"):
+                        logger.warning(f"No geocoding result for {address}: {data.get('status')}")
+                        return
+                    match = data["results"][0]
+                    location = match["geometry"]["location"]
+                    results[address] = GeocodeResult(
+                        latitude=float(location["lat"]),
+                        longitude=float(location["lng"]),
+                        formatted_address=match.get("formatted_address"),
+                        provider=self.name,
+                    )
+                except httpx.HTTPStatusError as e:
+                    # The error message includes the request URL, which carries the API key
+                    logger.warning(f"Geocoding failed for {address}: HTTP {e.response.status_code}")
+                except httpx.HTTPError as e:
+                    logger.warning(f"Geocoding failed for {address}: {type(e).__name__}")
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Unexpected geocoding response for {address}: {type(e).__name__}")
+
+        async with httpx.AsyncClient(timeout=10.0, transport=self.transport) as client:
+            await asyncio.gather(*(lookup(client, address) for address in addresses))
+        return results
+
+
+class StubGeocodingProvider(GeocodingProvider):
+    """Offline provider for tests and local development.
+
+    Coordinates are derived from a hash of the address so the same address
+    always resolves to the same point inside the continental US. Addresses
+    listed in `unresolvable` come back as not found.
+    """
+
+    name = "stub"
+
+    def __init__(self, unresolvable: Iterable[str] = ()):
+        self.unresolvable = set(unresolvable)
+        self.calls: List[List[str]] = []
+
+    async def geocode(self, addresses: List[str]) -> Dict[str, Optional[GeocodeResult]]:
+        self.calls.append(list(addresses))
+        results: Dict[str, Optional[GeocodeResult]] = {}
+        for address in addresses:
+            if address in self.unresolvable:
+                results[address] = None
+                continue
+            digest = hashlib.sha256(address.encode("utf-8")).digest()
+            lat_fraction = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+            lng_fraction = int.from_bytes(digest[4:8], "big") / 0xFFFFFFFF
+            results[address] = GeocodeResult(
+                latitude=round(25.0 + lat_fraction * 24.0, 6),
+                longitude=round(-124.0 + lng_fraction * 57.0, 6),
+                formatted_address=address,
+                provider=self.name,
+            )
+        return results
+
+
+def get_geocoding_provider(name: Optional[str] = None) -> GeocodingProvider:
+    name = name or settings.GEOCODING_PROVIDER
+    if name == "google":
+        return GoogleGeocodingProvider()
+    if name == "stub":
+        return StubGeocodingProvider()
+    raise ValueError(f"Unknown geocoding provider: {name}")
+
+
+class GeocodingService:
+    """Geocoding backed by an in-memory LRU and the persistent geocode_cache table.
+
+    New cache rows are written in the caller's transaction and persist when
+    the caller commits.
+    """
+
+    # Shared across service instances so it survives between requests
+    _lru = LRUCache(settings.GEOCODE_LRU_SIZE)
+
+    def __init__(self, db: AsyncSession, provider: Optional[GeocodingProvider] = None):
+        self.db = db
+        self.provider = provider
+
+    async def geocode(
+        self,
+        address: str,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        zip_code: Optional[str] = None,
+    ) -> Optional[GeocodeResult]:
+        """Geocode a single address"""
+        key = normalize_address(address, city, state, zip_code)
+        query = ", ".join(part for part in (address, city, state, zip_code) if part)
+        results = await self.geocode_normalized({key: query})
+        return results.get(key)
+
+    async def geocode_batch(self, addresses: Iterable[str]) -> Dict[str, Optional[GeocodeResult]]:
+        """Geocode one-line addresses, keyed by the address as given.
+
+        City, state and ZIP are parsed out of each line so the cache key
+        matches the one built by geocode() from structured fields. The first
+        spelling seen for each key is what gets sent to the provider.
+        """
+        keys = {address: normalize_address(address) for address in addresses}
+        queries: Dict[str, str] = {}
+        for address, key in keys.items():
+            queries.setdefault(key, address)
+        results = await self.geocode_normalized(queries)
+        return {address: results.get(key) for address, key in keys.items()}
+
+    async def geocode_normalized(self, queries: Dict[str, str]) -> Dict[str, GeocodeResult]:
+        """Resolve normalized keys from the LRU, then the cache table, then the provider.
+
+        `queries` maps each normalized key to the address text sent to the
+        provider on a miss. Keys the provider cannot resolve are cached as
+        not found and left out of the result.
+        """
+        results: Dict[str, GeocodeResult] = {}
+        pending = []
+        for key in queries:
+            cached = self._lru.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append(key)
+        if not pending:
+            return results
+
+        stored = await self._load_cached(pending)
+        for key, result in stored.items():
+            if result is not None:
+                self._lru.put(key, result)
+                results[key] = result
+
+        misses = [key for key in pending if key not in stored]
+        if misses:
+            if self.provider is None:
+                self.provider = get_geocoding_provider()
+            resolved = await self.provider.geocode([queries[key] for key in misses])
+            found = {
+                key: resolved[queries[key]] for key in misses if resolved.get(queries[key]) is not None
+            }
+            not_found = [key for key in misses if queries[key] in resolved and key not in found]
+            await self._store(found, not_found)
+            for key, result in found.items():
+                self._lru.put(key, result)
+            results.update(found)
+
+        logger.info(
+            f"Geocoded {len(pending)} uncached addresses: "
+            f"{len(stored)} from cache table, {len(misses)} sent to provider"
+        )
+        return results
+
+    async def _load_cached(self, keys: List[str]) -> Dict[str, Optional[GeocodeResult]]:
+        """Cached rows by key; None marks an address the provider could not resolve"""
+        retry_before = datetime.now(timezone.utc) - timedelta(days=settings.GEOCODE_NOT_FOUND_TTL_DAYS)
+        cached: Dict[str, Optional[GeocodeResult]] = {}
+        for start in range(0, len(keys), CACHE_BATCH_SIZE):
+            result = await self.db.execute(
+                select(GeocodeCache)
+                .where(GeocodeCache.normalized_address.in_(keys[start:start + CACHE_BATCH_SIZE]))
+            )
+            for row in result.scalars().all():
+                if row.status == NOT_FOUND:
+                    if (row.updated_at or row.created_at) >= retry_before:
+                        cached[row.normalized_address] = None
+                    continue
+                cached[row.normalized_address] = GeocodeResult(
+                    latitude=row.latitude,
+                    longitude=row.longitude,
+                    formatted_address=row.formatted_address,
+                    provider=row.provider,
+                )
+        return cached
+
+    async def _store(self, found: Dict[str, GeocodeResult], not_found: List[str]) -> None:
+        rows = [
+            {
+                "normalized_address": key,
+                "status": FOUND,
+                "latitude": result.latitude,
+                "longitude": result.longitude,
+                "formatted_address": result.formatted_address,
+                "provider": result.provider,
+            }
+            for key, result in found.items()
+        ]
+        rows.extend(
+            {
+                "normalized_address": key,
+                "status": NOT_FOUND,
+                "latitude": None,
+                "longitude": None,
+                "formatted_address": None,
+                "provider": self.provider.name,
+            }
+            for key in not_found
+        )
+        for start in range(0, len(rows), CACHE_BATCH_SIZE):
+            statement = insert(GeocodeCache).values(rows[start:start + CACHE_BATCH_SIZE])
+            # Expired not_found rows are retried and overwritten in place
+            await self.db.execute(statement.on_conflict_do_update(
+                index_elements=["normalized_address"],
+                set_={
+                    "status": statement.excluded.status,
+                    "latitude": statement.excluded.latitude,
+                    "longitude": statement.excluded.longitude,
+                    "formatted_address": statement.excluded.formatted_address,
+                    "provider": statement.excluded.provider,
+                    "updated_at": func.now(),
+                },
+            ))
+
+    @classmethod
+    def clear_memory_cache(cls) -> None:
+        cls._lru.clear()
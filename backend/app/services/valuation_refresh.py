@@ -0,0 +1,323 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import and_, exists, func, insert, not_, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.property import Property
+from app.models.valuation import PropertyValuation
+
+logger = logging.getLogger(__name__)
+
+MarketKey = Tuple[str, str]  # (state, city)
+Month = Tuple[int, int]  # (year, month)
+
+# Marks rows written by this job; they are kept out of the market index
+REFRESH_METHOD = "batch_refresh"
+
+# Relative change above which the market trend is no longer "stable"
+TREND_THRESHOLD = 0.02
+
+# Bounds on the relative half-width of the confidence interval
+MIN_SPREAD = 0.05
+MAX_SPREAD = 0.5
+
+# Spread used when the market has no price history to index against
+UNINDEXED_SPREAD = 0.15
+
+# Dollar-denominated fields that move with the market
+GROWTH_SCALED_FIELDS = (
+    "land_value",
+    "improvement_value",
+    "depreciation_amount",
+    "lot_value_per_sq_ft",
+    "renovation_impact",
+    "replacement_cost",
+    "actual_cash_value",
+    "dwelling_coverage_amount",
+)
+
+# Fields carried forward unchanged from the prior valuation
+CARRIED_FIELDS = (
+    "analysis_id",
+    "comparable_properties",
+    "days_on_market_estimate",
+    "location_adjustment",
+    "condition_adjustment",
+    "risk_adjustment",
+    "feature_adjustments",
+    "mls_data",
+    "public_records",
+    "tax_assessment_data",
+    "primary_method",
+    "data_completeness",
+    "comparable_quality",
+    "market_activity_level",
+    "recommendations",
+)
+
+
+def market_key(state: str, city: str) -> MarketKey:
+    return (state.strip().upper(), city.strip().lower())
+
+
+def _month_number(when: datetime) -> int:
+    return when.year * 12 + when.month - 1
+
+
+@dataclass
+class MarketIndex:
+    """Monthly median price per square foot of all valuations in one market"""
+
+    medians: Dict[Month, float] = field(default_factory=dict)
+    dispersion: Optional[float] = None  # half the interquartile range over the median, latest month
+
+    def __post_init__(self):
+        months = sorted(self.medians)
+        self._months = np.array([year * 12 + month - 1 for year, month in months], dtype=np.int64)
+        self._values = np.array([self.medians[month] for month in months], dtype=float)
+
+    def medians_at(self, months: np.ndarray) -> np.ndarray:
+        """Median for the latest indexed month at or before each month number, NaN if none"""
+        months = np.asarray(months, dtype=float)
+        values = np.full(months.shape, np.nan)
+        known = ~np.isnan(months)
+        position = np.searchsorted(self._months, months[known], side="right") - 1
+        found = np.full(months.shape, False)
+        found[known] = position >= 0
+        values[found] = self._values[position[position >= 0]]
+        return values
+
+    def growth(self, since: np.ndarray, until: datetime) -> np.ndarray:
+        """Relative market movement from each month number to `until`, NaN when unknown"""
+        start = self.medians_at(since)
+        end = self.medians_at(np.array([_month_number(until)]))[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = end / start
+        growth[~np.isfinite(growth) | (growth <= 0)] = np.nan
+        return growth
+
+
+class ValuationRefreshService:
+    """Batched refresh of valuations that are about to expire"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_expiring(
+        self,
+        lookahead_days: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[PropertyValuation, Property]]:
+        """Return the latest valuation of each property if it expires within the lookahead window"""
+        if lookahead_days is None:
+            lookahead_days = settings.VALUATION_REFRESH_LOOKAHEAD_DAYS
+        if limit is None:
+            limit = settings.VALUATION_REFRESH_MAX_PER_RUN
+        cutoff = datetime.now(timezone.utc) + timedelta(days=lookahead_days)
+
+        newer = aliased(PropertyValuation)
+        has_newer = exists().where(and_(
+            newer.property_id == PropertyValuation.property_id,
+            newer.valuation_date > PropertyValuation.valuation_date,
+        ))
+        query = (
+            select(PropertyValuation, Property)
+            .join(Property, Property.id == PropertyValuation.property_id)
+            .where(PropertyValuation.expiration_date <= cutoff)
+            .where(not_(has_newer))
+            .order_by(PropertyValuation.expiration_date)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [(valuation, prop) for valuation, prop in result.all()]
+
+    async def load_market_indexes(
+        self,
+        markets: List[MarketKey],
+        since: datetime,
+    ) -> Dict[MarketKey, MarketIndex]:
+        """Build monthly price per square foot indexes for the given markets in one query.
+
+        Rows written by this job are excluded, and months with fewer than
+        VALUATION_INDEX_MIN_SAMPLE valuations are dropped so lookups fall back
+        to the previous month.
+        """
+        if not markets:
+            return {}
+
+        state = func.upper(func.trim(Property.state))
+        city = func.lower(func.trim(Property.city))
+        month = func.date_trunc("month", PropertyValuation.valuation_date)
+        psf = PropertyValuation.sq_ft_value
+        methods = PropertyValuation.methods_used
+        query = (
+            select(
+                state,
+                city,
+                month,
+                func.percentile_cont(0.5).within_group(psf),
+                func.percentile_cont(0.25).within_group(psf),
+                func.percentile_cont(0.75).within_group(psf),
+            )
+            .join(Property, Property.id == PropertyValuation.property_id)
+            .where(psf.is_not(None), psf > 0)
+            .where(PropertyValuation.valuation_date >= since)
+            .where(or_(methods.is_(None), not_(methods.contains([REFRESH_METHOD]))))
+            .where(tuple_(state, city).in_(markets))
+            .group_by(state, city, month)
+            .having(func.count() >= settings.VALUATION_INDEX_MIN_SAMPLE)
+            .order_by(month)
+        )
+        result = await self.db.execute(query)
+
+        medians: Dict[MarketKey, Dict[Month, float]] = defaultdict(dict)
+        dispersion: Dict[MarketKey, Optional[float]] = {}
+        for row_state, row_city, row_month, median, p25, p75 in result.all():
+            key = (row_state, row_city)
+            medians[key][(row_month.year, row_month.month)] = median
+            # Rows are ordered by month, so the last one written is the latest
+            dispersion[key] = (p75 - p25) / (2 * median) if median else None
+        return {
+            key: MarketIndex(medians=months, dispersion=dispersion[key])
+            for key, months in medians.items()
+        }
+
+    @staticmethod
+    def group_by_market(
+        rows: List[Tuple[PropertyValuation, Property]]
+    ) -> Dict[MarketKey, List[Tuple[PropertyValuation, Property]]]:
+        """Group valuations by the market (state, city) of their property"""
+        groups: Dict[MarketKey, List[Tuple[PropertyValuation, Property]]] = defaultdict(list)
+        for valuation, prop in rows:
+            groups[market_key(prop.state, prop.city)].append((valuation, prop))
+        return groups
+
+    @staticmethod
+    def recompute_group(
+        rows: List[Tuple[PropertyValuation, Property]],
+        market_index: Optional[MarketIndex] = None,
+        now: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Recompute a whole market group in one vectorized AVM pass.
+
+        Each prior valuation is moved by the market's change in median price
+        per square foot since its effective date. The seasonal factor is
+        folded into that movement, since the monthly index already carries
+        seasonality, and the combined move is recorded in `market_adjustment`.
+        Location, condition and risk adjustments are re-applied unchanged and
+        dollar-denominated fields scale with the value. Returns rows ready for
+        a bulk insert.
+        """
+        now = now or datetime.now(timezone.utc)
+        market_index = market_index or MarketIndex()
+
+        def column(values) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+        valuations = [valuation for valuation, _ in rows]
+        prior_value = column(v.estimated_value for v in valuations)
+        sq_ft = column(prop.square_footage for _, prop in rows)
+        sq_ft[sq_ft <= 0] = np.nan
+
+        location = np.nan_to_num(column(v.location_adjustment for v in valuations))
+        condition = np.nan_to_num(column(v.condition_adjustment for v in valuations))
+        market = np.nan_to_num(column(v.market_adjustment for v in valuations))
+        risk = np.nan_to_num(column(v.risk_adjustment for v in valuations))
+        seasonal = np.nan_to_num(column(v.seasonal_factor for v in valuations), nan=1.0)
+        seasonal[seasonal <= 0] = 1.0
+
+        other = (1 + location / 100) * (1 + condition / 100) * (1 + risk / 100)
+        market_factor = (1 + market / 100) * seasonal
+        multiplier = other * market_factor
+        multiplier[multiplier <= 0] = 1.0
+        base_value = prior_value / multiplier
+
+        since_dates = (v.effective_date or v.valuation_date for v in valuations)
+        since = column(_month_number(d) if d else None for d in since_dates)
+        growth = market_index.growth(since, now)
+        indexed = ~np.isnan(growth)
+        growth = np.where(indexed, growth, 1.0)
+
+        new_market = (market_factor * growth - 1) * 100
+        new_value = base_value * other * (1 + new_market / 100)
+        new_psf = new_value / sq_ft
+        value_ratio = new_value / prior_value
+
+        if market_index.dispersion is not None:
+            market_spread = float(np.clip(market_index.dispersion, MIN_SPREAD, MAX_SPREAD))
+        else:
+            market_spread = UNINDEXED_SPREAD
+        spread = np.where(indexed, market_spread, max(market_spread, UNINDEXED_SPREAD))
+        confidence = 1.0 - spread
+
+        change = growth - 1.0
+        trend = np.where(
+            change > TREND_THRESHOLD, "increasing",
+            np.where(change < -TREND_THRESHOLD, "declining", "stable"),
+        )
+
+        expiration = now + timedelta(days=settings.VALUATION_VALIDITY_DAYS)
+        new_rows = []
+        for i, valuation in enumerate(valuations):
+            if np.isnan(new_value[i]):
+                continue
+            row = {name: getattr(valuation, name) for name in CARRIED_FIELDS}
+            for name in GROWTH_SCALED_FIELDS:
+                amount = getattr(valuation, name)
+                row[name] = None if amount is None else float(amount * value_ratio[i])
+            methods = list(valuation.methods_used or [])
+            if REFRESH_METHOD not in methods:
+                methods.append(REFRESH_METHOD)
+            row.update({
+                "property_id": valuation.property_id,
+                "estimated_value": float(new_value[i]),
+                "confidence_interval_low": float(new_value[i] * (1 - spread[i])),
+                "confidence_interval_high": float(new_value[i] * (1 + spread[i])),
+                "confidence_score": float(confidence[i]),
+                "market_trend": str(trend[i]) if indexed[i] else valuation.market_trend,
+                "sq_ft_value": None if np.isnan(new_psf[i]) else float(new_psf[i]),
+                "market_adjustment": float(new_market[i]),
+                "seasonal_factor": None,
+                "methods_used": methods,
+                "model_version": settings.MODEL_VERSION,
+                "valuation_date": now,
+                "effective_date": now,
+                "expiration_date": expiration,
+                "valuation_notes": f"Refreshed from valuation {valuation.id}",
+            })
+            new_rows.append(row)
+        return new_rows
+
+    async def refresh_expiring(self, lookahead_days: Optional[int] = None) -> dict:
+        """Find expiring valuations, recompute them per market and bulk insert the results"""
+        rows = await self.find_expiring(lookahead_days)
+        groups = self.group_by_market(rows)
+        now = datetime.now(timezone.utc)
+
+        if rows:
+            oldest = min(v.effective_date or v.valuation_date or now for v, _ in rows)
+            indexes = await self.load_market_indexes(list(groups), oldest.replace(day=1) - timedelta(days=31))
+        else:
+            indexes = {}
+
+        refreshed = 0
+        for (state, city), group in groups.items():
+            new_rows = self.recompute_group(group, indexes.get((state, city)), now=now)
+            if new_rows:
+                await self.db.execute(insert(PropertyValuation), new_rows)
+                await self.db.commit()
+            refreshed += len(new_rows)
+            logger.info(f"Refreshed {len(new_rows)} valuations in {city}, {state}")
+
+        return {
+            "expiring": len(rows),
+            "markets": len(groups),
+            "refreshed": refreshed,
+        }
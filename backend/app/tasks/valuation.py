@@ -0,0 +1,45 @@
+import asyncio
+import logging
+
+import redis
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services.valuation_refresh import ValuationRefreshService
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_NAME = "locks:valuation-refresh"
+
+async def _refresh_expiring_valuations() -> dict:
+    try:
+        async with AsyncSessionLocal() as session:
+            service = ValuationRefreshService(session)
+            return await service.refresh_expiring()
+    finally:
+        # Pooled asyncpg connections are bound to this run's event loop
+        await engine.dispose()
+
+@celery_app.task(
+    name="app.tasks.valuation.refresh_expiring_valuations",
+    rate_limit=settings.VALUATION_REFRESH_RATE_LIMIT,
+    ignore_result=False,
+)
+def refresh_expiring_valuations() -> dict:
+    """Refresh valuations nearing expiry in batched, per-market passes"""
+    client = redis.Redis.from_url(settings.REDIS_URL)
+    lock = client.lock(REFRESH_LOCK_NAME, timeout=settings.VALUATION_REFRESH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        logger.info("Valuation refresh already running, skipping")
+        return {"skipped": True}
+
+    try:
+        summary = asyncio.run(_refresh_expiring_valuations())
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            logger.warning("Valuation refresh lock expired before the run finished")
+    logger.info(f"Valuation refresh complete: {summary}")
+    return summary
@@ -26,6 +26,8 @@ CREATE INDEX IF NOT EXISTS idx_hazards_composite_risk ON hazard_assessments (com
 
 CREATE INDEX IF NOT EXISTS idx_valuations_property_id ON property_valuations (property_id);
 CREATE INDEX IF NOT EXISTS idx_valuations_value ON property_valuations (estimated_value);
+CREATE INDEX IF NOT EXISTS idx_valuations_expiration ON property_valuations (expiration_date);
+CREATE INDEX IF NOT EXISTS idx_valuations_property_date ON property_valuations (property_id, valuation_date DESC);
 
 CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
 CREATE INDEX IF NOT EXISTS idx_users_active ON users (is_active, role);
@@ -0,0 +1,2 @@
+# Models must be registered through app.db.base before they are imported directly
+import app.db.base  # noqa: F401
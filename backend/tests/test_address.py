@@ -0,0 +1,65 @@
+import pytest
+
+from app.services.address import normalize_address, normalize_street, split_address
+
+CANONICAL = "123 N MAIN ST, SPRINGFIELD, IL, 62701"
+
+
+@pytest.mark.parametrize("address", [
+    "123 N Main St, Springfield, IL 62701",
+    "123 North Main Street, Springfield, Illinois 62701-1234",
+    "123 n. main st., springfield, il, 62701",
+    "123 North Main St, Springfield IL 62701",
+    "  123   NORTH   MAIN   STREET ,  SPRINGFIELD , IL  627011234 ",
+])
+def test_one_line_spellings_share_a_key(address):
+    assert normalize_address(address) == CANONICAL
+
+
+def test_one_line_and_structured_forms_agree():
+    assert normalize_address("123 North Main Street", "Springfield", "Illinois", "62701-1234") == CANONICAL
+    assert normalize_address("123 N Main St", "springfield", "IL", "62701") == CANONICAL
+
+
+@pytest.mark.parametrize("street", [
+    "123 Main St Apt 4",
+    "123 Main St #4",
+    "123 Main St Apt #4",
+    "123 Main Street, Apartment 4",
+    "123 Main St Suite 4",
+    "123 Main St Unit # 4",
+])
+def test_unit_forms_share_a_key(street):
+    assert normalize_street(street) == "123 MAIN ST UNIT 4"
+
+
+def test_multi_word_state_names():
+    assert normalize_address("1 Elm Rd, Charleston, West Virginia 25301") == "1 ELM RD, CHARLESTON, WV, 25301"
+    assert normalize_address("1 Elm Rd, Richmond, Virginia 23219") == "1 ELM RD, RICHMOND, VA, 23219"
+
+
+def test_split_address_components():
+    assert split_address("123 Main St, Apt 4, Springfield, IL 62701") == (
+        "123 Main St, Apt 4", "Springfield", "IL", "62701"
+    )
+
+
+def test_trailing_unit_stays_with_street():
+    assert split_address("123 Main St, Apt 4") == ("123 Main St, Apt 4", None, None, None)
+    assert normalize_address("123 Main St, Apt 4") == "123 MAIN ST UNIT 4"
+
+
+@pytest.mark.parametrize("street, expected", [
+    ("100 Court Street", "100 COURT ST"),
+    ("1 North St", "1 NORTH ST"),
+    ("5 North Main Street", "5 N MAIN ST"),
+    ("10 Park Avenue South", "10 PARK AVE S"),
+    ("1 Avenue of the Americas", "1 AVENUE OF THE AMERICAS"),
+])
+def test_only_suffix_and_directional_positions_are_abbreviated(street, expected):
+    assert normalize_street(street) == expected
+
+
+def test_city_without_state_or_zip():
+    assert normalize_address("123 Main St, Springfield") == normalize_address("123 Main St", "Springfield")
+    assert normalize_address("100 Court St, Washington") == "100 COURT ST, WASHINGTON"
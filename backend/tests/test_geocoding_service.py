@@ -0,0 +1,209 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import logging
+
+import httpx
+import pytest
+
+from app.services.address import normalize_address
+from app.services.geocoding_service import (
+    CACHE_BATCH_SIZE,
+    NOT_FOUND,
+    GeocodeResult,
+    GeocodingService,
+    GoogleGeocodingProvider,
+    LRUCache,
+    StubGeocodingProvider,
+)
+
+
+class InMemoryGeocodingService(GeocodingService):
+    """GeocodingService with the geocode_cache table replaced by a dict"""
+
+    def __init__(self, provider, table=None):
+        super().__init__(db=None, provider=provider)
+        self.table = {} if table is None else table
+        self.loaded = []
+
+    async def _load_cached(self, keys):
+        self.loaded.append(list(keys))
+        return {key: self.table[key] for key in keys if key in self.table}
+
+    async def _store(self, found, not_found):
+        self.table.update(found)
+        self.table.update(dict.fromkeys(not_found))
+
+
+class RecordingSession:
+    """Stands in for AsyncSession and records each statement's bind parameters"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement):
+        compiled = statement.compile()
+        self.statements.append(compiled.params)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.rows))
+
+
+@pytest.fixture(autouse=True)
+def clear_lru():
+    GeocodingService.clear_memory_cache()
+    yield
+    GeocodingService.clear_memory_cache()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    a, b, c = (GeocodeResult(latitude=i, longitude=i) for i in range(3))
+
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") == a  # "b" is now least recently used
+    cache.put("c", c)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == a
+    assert cache.get("c") == c
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_each_miss_to_provider_once_as_given():
+    provider = StubGeocodingProvider()
+    service = InMemoryGeocodingService(provider)
+
+    results = await service.geocode_batch([
+        "123 Main St, Springfield, IL 62701",
+        "123 Main Street, Springfield, Illinois 62701-1234",
+        "100 Court Street, Brooklyn, NY 11201",
+    ])
+
+    assert provider.calls == [[
+        "123 Main St, Springfield, IL 62701",
+        "100 Court Street, Brooklyn, NY 11201",
+    ]]
+    assert results["123 Main St, Springfield, IL 62701"] == results[
+        "123 Main Street, Springfield, Illinois 62701-1234"
+    ]
+    assert all(result is not None for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_batch_only_sends_cache_misses():
+    provider = StubGeocodingProvider()
+    known = normalize_address("123 Main St", "Springfield", "IL", "62701")
+    table = {known: GeocodeResult(latitude=39.8, longitude=-89.6, provider="google")}
+    service = InMemoryGeocodingService(provider, table)
+
+    results = await service.geocode_batch([
+        "123 Main St, Springfield, IL 62701",
+        "456 Oak Ave, Springfield, IL 62702",
+    ])
+
+    assert provider.calls == [["456 Oak Ave, Springfield, IL 62702"]]
+    assert results["123 Main St, Springfield, IL 62701"].provider == "google"
+
+
+@pytest.mark.asyncio
+async def test_repeat_batches_are_served_from_memory():
+    provider = StubGeocodingProvider()
+    service = InMemoryGeocodingService(provider)
+    addresses = ["123 Main St, Springfield, IL 62701", "456 Oak Ave, Springfield, IL 62702"]
+
+    first = await service.geocode_batch(addresses)
+    second = await InMemoryGeocodingService(provider, service.table).geocode_batch(addresses)
+
+    assert first == second
+    assert len(provider.calls) == 1
+    assert service.loaded == [[
+        "123 MAIN ST, SPRINGFIELD, IL, 62701",
+        "456 OAK AVE, SPRINGFIELD, IL, 62702",
+    ]]
+
+
+@pytest.mark.asyncio
+async def test_unresolvable_addresses_are_not_resent():
+    provider = StubGeocodingProvider(unresolvable={"1 Nowhere Rd, Springfield, IL 62701"})
+    service = InMemoryGeocodingService(provider)
+    addresses = ["1 Nowhere Rd, Springfield, IL 62701", "456 Oak Ave, Springfield, IL 62702"]
+
+    first = await service.geocode_batch(addresses)
+    second = await service.geocode_batch(addresses)
+
+    assert first["1 Nowhere Rd, Springfield, IL 62701"] is None
+    assert second["1 Nowhere Rd, Springfield, IL 62701"] is None
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_structured_geocode_hits_batch_cache():
+    provider = StubGeocodingProvider()
+    service = InMemoryGeocodingService(provider)
+
+    batch = await service.geocode_batch(["123 Main Street, Springfield, Illinois 62701"])
+    single = await service.geocode("123 Main St", "Springfield", "IL", "62701")
+
+    assert single == batch["123 Main Street, Springfield, Illinois 62701"]
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_reads_and_writes_are_chunked():
+    session = RecordingSession()
+    service = GeocodingService(session, provider=StubGeocodingProvider())
+    keys = [f"{n} MAIN ST, SPRINGFIELD, IL, 62701" for n in range(2 * CACHE_BATCH_SIZE + 1)]
+
+    await service._load_cached(keys)
+    assert len(session.statements) == 3
+
+    session.statements.clear()
+    found = {key: GeocodeResult(latitude=1.0, longitude=2.0) for key in keys}
+    await service._store(found, ["1 NOWHERE RD"])
+    assert len(session.statements) == 3
+    assert all(len(params) < 32767 for params in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_expired_not_found_rows_are_retried():
+    fresh = SimpleNamespace(
+        normalized_address="FRESH", status=NOT_FOUND, updated_at=None,
+        created_at=datetime.now(timezone.utc),
+    )
+    stale = SimpleNamespace(
+        normalized_address="STALE", status=NOT_FOUND, updated_at=None,
+        created_at=datetime(2000, 1, 1, tzinfo=timezone.utc),
+    )
+    service = GeocodingService(RecordingSession([fresh, stale]))
+
+    assert await service._load_cached(["FRESH", "STALE"]) == {"FRESH": None}
+
+
+@pytest.mark.asyncio
+async def test_google_errors_do_not_leak_key_or_drop_results(caplog):
+    def handler(request):
+        address = request.url.params["address"]
+        if address == "forbidden":
+            return httpx.Response(403)
+        if address == "garbled":
+            return httpx.Response(200, content=b"not json")
+        if address == "partial":
+            return httpx.Response(200, json={"status": "OK", "results": [{"geometry": {}}]})
+        if address == "nowhere":
+            return httpx.Response(200, json={"status": "ZERO_RESULTS", "results": []})
+        return httpx.Response(200, json={
+            "status": "OK",
+            "results": [{"geometry": {"location": {"lat": 1.5, "lng": -2.5}}, "formatted_address": address}],
+        })
+
+    provider = GoogleGeocodingProvider(api_key="SECRETKEY", transport=httpx.MockTransport(handler))
+    with caplog.at_level(logging.WARNING):
+        results = await provider.geocode(["forbidden", "garbled", "partial", "nowhere", "1 Main St"])
+
+    assert results == {
+        "nowhere": None,
+        "1 Main St": GeocodeResult(latitude=1.5, longitude=-2.5, formatted_address="1 Main St", provider="google"),
+    }
+    assert "HTTP 403" in caplog.text
+    assert "SECRETKEY" not in caplog.text
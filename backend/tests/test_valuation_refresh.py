@@ -0,0 +1,198 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services.valuation_refresh import (
+    CARRIED_FIELDS,
+    GROWTH_SCALED_FIELDS,
+    MAX_SPREAD,
+    MIN_SPREAD,
+    UNINDEXED_SPREAD,
+    MarketIndex,
+    ValuationRefreshService,
+)
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+PRIOR = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+
+def make_valuation(estimated_value, **overrides):
+    fields = dict.fromkeys(CARRIED_FIELDS + GROWTH_SCALED_FIELDS)
+    fields.update(
+        id=uuid.uuid4(),
+        property_id=uuid.uuid4(),
+        analysis_id=None,
+        estimated_value=estimated_value,
+        location_adjustment=None,
+        condition_adjustment=None,
+        market_adjustment=None,
+        risk_adjustment=None,
+        seasonal_factor=None,
+        market_trend="stable",
+        methods_used=None,
+        effective_date=PRIOR,
+        valuation_date=PRIOR,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def make_property(square_footage=2000, city="San Francisco", state="CA"):
+    return SimpleNamespace(square_footage=square_footage, city=city, state=state)
+
+
+def rising_market(growth=1.1, dispersion=0.1):
+    return MarketIndex(medians={(2026, 7): 400.0, (2026, 10): 400.0 * growth}, dispersion=dispersion)
+
+
+def test_market_change_applied_without_pulling_toward_median():
+    rows = [
+        (make_valuation(2_000_000), make_property()),
+        (make_valuation(400_000), make_property()),
+        (make_valuation(500_000), make_property()),
+    ]
+
+    new_rows = ValuationRefreshService.recompute_group(rows, rising_market(1.1), now=NOW)
+
+    values = [row["estimated_value"] for row in new_rows]
+    assert values == pytest.approx([2_200_000, 440_000, 550_000])
+    assert {row["market_trend"] for row in new_rows} == {"increasing"}
+
+
+def test_adjustments_are_stripped_and_reapplied():
+    valuation = make_valuation(
+        1_000_000,
+        location_adjustment=10.0,
+        condition_adjustment=-5.0,
+        market_adjustment=4.0,
+        risk_adjustment=-2.0,
+        seasonal_factor=1.02,
+    )
+
+    (row,) = ValuationRefreshService.recompute_group(
+        [(valuation, make_property())], rising_market(1.05), now=NOW
+    )
+
+    assert row["estimated_value"] == pytest.approx(1_050_000)
+    assert row["location_adjustment"] == 10.0
+    assert row["condition_adjustment"] == -5.0
+    assert row["risk_adjustment"] == -2.0
+    assert row["sq_ft_value"] == pytest.approx(1_050_000 / 2000)
+
+
+def test_seasonality_folds_into_market_move():
+    valuation = make_valuation(1_020_000, market_adjustment=4.0, seasonal_factor=1.02)
+
+    (row,) = ValuationRefreshService.recompute_group(
+        [(valuation, make_property())], rising_market(1.05), now=NOW
+    )
+
+    # The monthly index already carries the seasonal move, so it is not applied twice
+    assert row["estimated_value"] == pytest.approx(1_020_000 * 1.05)
+    assert row["seasonal_factor"] is None
+    assert row["market_adjustment"] == pytest.approx((1.04 * 1.02 * 1.05 - 1) * 100)
+
+
+def test_prior_fields_carried_forward():
+    valuation = make_valuation(
+        500_000,
+        primary_method="cost",
+        methods_used=["cost"],
+        replacement_cost=400_000.0,
+        dwelling_coverage_amount=420_000.0,
+        land_value=None,
+        comparable_properties=[{"address": "1 Elm Rd"}],
+        recommendations=["Update roof"],
+    )
+
+    (row,) = ValuationRefreshService.recompute_group(
+        [(valuation, make_property())], rising_market(1.1), now=NOW
+    )
+
+    assert row["primary_method"] == "cost"
+    assert row["methods_used"] == ["cost", "batch_refresh"]
+    assert row["replacement_cost"] == pytest.approx(440_000)
+    assert row["dwelling_coverage_amount"] == pytest.approx(462_000)
+    assert row["land_value"] is None
+    assert row["comparable_properties"] == [{"address": "1 Elm Rd"}]
+    assert row["recommendations"] == ["Update roof"]
+
+
+def test_missing_square_footage_still_refreshed():
+    rows = [
+        (make_valuation(600_000), make_property(square_footage=None)),
+        (make_valuation(600_000), make_property(square_footage=0)),
+    ]
+
+    new_rows = ValuationRefreshService.recompute_group(rows, rising_market(1.1), now=NOW)
+
+    assert [row["estimated_value"] for row in new_rows] == pytest.approx([660_000, 660_000])
+    assert all(row["sq_ft_value"] is None for row in new_rows)
+
+
+def test_unindexed_market_keeps_value():
+    valuation = make_valuation(750_000, market_trend="declining")
+
+    (row,) = ValuationRefreshService.recompute_group([(valuation, make_property())], None, now=NOW)
+
+    assert row["estimated_value"] == pytest.approx(750_000)
+    assert row["market_trend"] == "declining"
+    assert row["confidence_score"] == pytest.approx(1 - UNINDEXED_SPREAD)
+
+
+@pytest.mark.parametrize("dispersion", [0.0, 0.2, 1.46, 10.0])
+def test_interval_stays_positive_and_bounded(dispersion):
+    valuation = make_valuation(500_000)
+
+    (row,) = ValuationRefreshService.recompute_group(
+        [(valuation, make_property())], rising_market(1.0, dispersion), now=NOW
+    )
+
+    value = row["estimated_value"]
+    assert 0 < row["confidence_interval_low"] < value < row["confidence_interval_high"]
+    assert value * (1 - MAX_SPREAD) <= row["confidence_interval_low"] <= value * (1 - MIN_SPREAD)
+    assert 1 - MAX_SPREAD <= row["confidence_score"] <= 1 - MIN_SPREAD
+
+
+def test_refreshed_rows_get_new_validity_window():
+    (row,) = ValuationRefreshService.recompute_group(
+        [(make_valuation(500_000), make_property())], rising_market(), now=NOW
+    )
+
+    assert row["effective_date"] == NOW
+    assert row["expiration_date"] > NOW
+
+
+def month_number(year, month):
+    return year * 12 + month - 1
+
+
+def test_market_index_uses_latest_month_at_or_before_date():
+    index = MarketIndex(medians={(2026, 4): 330.0, (2026, 1): 300.0})
+
+    medians = index.medians_at(np.array([
+        month_number(2025, 12), month_number(2026, 3), month_number(2026, 4), np.nan,
+    ]))
+    assert np.isnan(medians[0])
+    assert medians[1:3].tolist() == [300.0, 330.0]
+    assert np.isnan(medians[3])
+
+    growth = index.growth(np.array([month_number(2026, 2), np.nan, month_number(2025, 1)]), NOW)
+    assert growth[0] == pytest.approx(1.1)
+    assert np.isnan(growth[1:]).all()
+
+
+def test_group_by_market_normalizes_city_and_state():
+    rows = [
+        (make_valuation(1), make_property(city="San Francisco", state="CA")),
+        (make_valuation(2), make_property(city="san francisco ", state="ca")),
+        (make_valuation(3), make_property(city="Oakland", state="CA")),
+    ]
+
+    groups = ValuationRefreshService.group_by_market(rows)
+
+    assert set(groups) == {("CA", "san francisco"), ("CA", "oakland")}
+    assert [v.estimated_value for v, _ in groups[("CA", "san francisco")]] == [1, 2]